@@ -1,14 +1,76 @@
 from operator import lt
-from itertools import starmap, tee
+from itertools import starmap, tee, islice
+from collections import deque
+from io import StringIO
+from timeit import timeit
+import sys
+import numpy as np
 
-with open('./input/day_01.txt', 'r') as f:
-    data = list(map(int, f))
+
+def load(f):
+    return list(map(int, f))
 
 def sum_lt(i):
     a, b = tee(i, 2)
     next(b)
     return sum(starmap(lt, zip(a, b)))
 
+def count_increases(i, k=1):
+    """
+    Window sums a[j:j+k] and a[j+1:j+k+1] share k-1 values, so the later
+    window is larger exactly when a[j+k] > a[j]. Only the last k values
+    are kept, the input can be any iterator or an open file.
+
+    >>> h = StringIO('199\\n200\\n208\\n210\\n200\\n207\\n240\\n269\\n260\\n263\\n')
+    >>> count_increases(h)
+    7
+    >>> count_increases(map(int, '199 200 208 210 200 207 240 269 260 263'.split()), k=3)
+    5
+    """
+    i = map(int, i)
+    window = deque(islice(i, k), maxlen=k)
+    count = 0
+    for n in i:
+        count += n > window[0]
+        window.append(n)
+    return count
+
+def count_increases_np(a, k=1, block=1 << 24):
+    """
+    Same as count_increases over a NumPy array or np.memmap, compared in
+    blocks so that no more than `block` elements are paged in at once.
+
+    >>> a = np.array([199, 200, 208, 210, 200, 207, 240, 269, 260, 263])
+    >>> count_increases_np(a), count_increases_np(a, k=3), count_increases_np(a, k=3, block=2)
+    (7, 5, 5)
+    """
+    count = 0
+    for start in range(0, max(len(a) - k, 0), block):
+        stop = min(start + block, len(a) - k)
+        count += int(np.count_nonzero(a[start+k:stop+k] > a[start:stop]))
+    return count
+
+def load_np(fname):
+    if fname.endswith('.npy'):
+        return np.load(fname, mmap_mode='r')
+    return np.fromfile(fname, dtype=np.int64, sep='\n')
+
+def benchmark(n=1_000_000, k=3, number=3):
+    data = np.random.default_rng(1).integers(0, 10_000, n)
+    as_list = data.tolist()
+    results = {
+        'tee/starmap': lambda: sum_lt(map(sum, zip(*(as_list[j:] for j in range(k))))),
+        'streaming': lambda: count_increases(iter(as_list), k),
+        'numpy': lambda: count_increases_np(data, k),
+    }
+    for name, func in results.items():
+        print(f'{name:>12}: {timeit(func, number=number) / number:.4f}s, result {func()}')
+
 if __name__ == '__main__':
+    if sys.argv[1:2] == ['bench']:
+        benchmark()
+        sys.exit()
+    with open('./input/day_01.txt', 'r') as f:
+        data = load(f)
     print(f'part 1: {sum_lt(data)}')
-    print(f'part 2: {sum_lt(map(sum, zip(data[0:], data[1:], data[2:])))}')
\ No newline at end of file
+    print(f'part 2: {sum_lt(map(sum, zip(data[0:], data[1:], data[2:])))}')
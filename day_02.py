@@ -1,3 +1,10 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, repeat
+from io import StringIO
+import os
+import numpy as np
+
+
 class Submarine:
     def __init__(self, commands):
         self.commands = commands
@@ -38,12 +45,115 @@ class SubmarineV2(Submarine):
             self.y = 0
 
 
-with open('./input/day_02.txt', 'r') as f:
+FORWARD, DOWN, UP = 0, 1, 2
+op_codes = {'forward': FORWARD, 'down': DOWN, 'up': UP}
+
+def load(f):
     commands = []
     for line in f:
         c, param = line.strip('\n').split(' ')
         commands.append((c, int(param)))
+    return commands
+
+def load_arrays(f):
+    tokens = f.read().split()
+    ops = np.fromiter(map(op_codes.get, tokens[0::2]), dtype=np.int8, count=len(tokens) // 2)
+    return ops, np.array(tokens[1::2], dtype=np.int64)
+
+def to_arrays(commands):
+    ops = np.fromiter((op_codes[c] for c, _ in commands), dtype=np.int8, count=len(commands))
+    params = np.fromiter((p for _, p in commands), dtype=np.int64, count=len(commands))
+    return ops, params
+
+def vertical_moves(ops, params):
+    return np.where(ops == DOWN, params, 0) - np.where(ops == UP, params, 0)
+
+def aim_delta(ops, params):
+    return int(vertical_moves(ops, params).sum())
+
+def partial_state(ops, params, aim=0, use_aim=False):
+    """
+    Summarize a run of commands as (dx, dy, low, daim).
+
+    Depth is floored at zero after every move, so starting from depth y the
+    run ends at dy + max(y, -low), where low is the lowest point (or 0) the
+    unfloored running sum of depth changes reaches.
+    """
+    forward = np.where(ops == FORWARD, params, 0)
+    vertical = vertical_moves(ops, params)
+    if use_aim:
+        depth = np.cumsum((aim + np.cumsum(vertical)) * forward)
+    else:
+        depth = np.cumsum(vertical)
+    if len(depth) == 0:
+        return 0, 0, 0, 0
+    return int(forward.sum()), int(depth[-1]), min(0, int(depth.min())), int(vertical.sum())
+
+
+class BatchSubmarine:
+    """
+    >>> commands = load(StringIO('forward 5\\ndown 5\\nforward 8\\nup 3\\ndown 8\\nforward 2'))
+    >>> BatchSubmarine(commands).get_final_pos(), BatchSubmarineV2(commands).get_final_pos()
+    (150, 900)
+    >>> BatchSubmarine(commands).get_final_pos_chunked(chunks=3)
+    150
+    >>> BatchSubmarineV2(commands).get_final_pos_chunked(chunks=3)
+    900
+    >>> BatchSubmarine([('up', 4), ('down', 2), ('forward', 1)]).get_final_pos()
+    2
+    """
+    use_aim = False
+
+    def __init__(self, commands):
+        if isinstance(commands, tuple):
+            self.ops, self.params = commands
+        else:
+            self.ops, self.params = to_arrays(commands)
+
+    def get_final_pos(self):
+        x, y, low, _ = partial_state(self.ops, self.params, use_aim=self.use_aim)
+        return x * (y - low)
+
+    def get_final_pos_chunked(self, workers=None, chunks=None):
+        chunks = chunks or os.cpu_count()
+        ops = np.array_split(self.ops, chunks)
+        params = np.array_split(self.params, chunks)
+        with ProcessPoolExecutor(workers) as executor:
+            aims = repeat(0)
+            if self.use_aim:
+                aims = accumulate(executor.map(aim_delta, ops, params), initial=0)
+            parts = executor.map(partial_state, ops, params, aims, repeat(self.use_aim))
+            x, y = 0, 0
+            for dx, dy, low, _ in parts:
+                x += dx
+                y = dy + max(y, -low)
+        return x * y
+
+
+class BatchSubmarineV2(BatchSubmarine):
+    use_aim = True
+
+
+def cross_check(commands, chunks=None):
+    """
+    >>> cross_check(load(StringIO('forward 5\\ndown 5\\nforward 8\\nup 3\\ndown 8\\nforward 2')), chunks=2)
+    {'part 1': 150, 'part 2': 900}
+    """
+    arrays = to_arrays(commands)
+    out = {}
+    for part, model, batch in (('part 1', Submarine, BatchSubmarine),
+                               ('part 2', SubmarineV2, BatchSubmarineV2)):
+        results = {model(commands).get_final_pos(),
+                   batch(arrays).get_final_pos(),
+                   batch(arrays).get_final_pos_chunked(chunks=chunks)}
+        if len(results) != 1:
+            raise ValueError(f'{part}: models disagree {sorted(results)}')
+        out[part] = results.pop()
+    return out
+
 
 if __name__ == '__main__':
+    with open('./input/day_02.txt', 'r') as f:
+        commands = load(f)
     print(f'part 1: {Submarine(commands).get_final_pos()}')
     print(f'part 2: {SubmarineV2(commands).get_final_pos()}')
@@ -1,10 +1,17 @@
 from collections import Counter
+from io import StringIO
 import numpy as np
 
-with open('./input/day_03.txt', 'r') as f:
-    data = np.array([list(map(int, list(line.strip('\n')))) for line in f])
+sample = '00100\n11110\n10110\n10111\n10101\n01111\n00111\n11100\n10000\n11001\n00010\n01010\n'
 
-def power_consumption():
+def load(f):
+    return np.array([list(map(int, list(line.strip('\n')))) for line in f])
+
+def power_consumption(data):
+    """
+    >>> int(power_consumption(load(StringIO(sample))))
+    198
+    """
     most, least = 0, 0
     for x in range(data.shape[1]):
         c = Counter(data[:, x])
@@ -12,7 +19,7 @@ def power_consumption():
         least = (least << 1) + min(c, key=c.get)
     return most * least
 
-def component_rating(tie_break=1, compare=max):
+def component_rating(data, tie_break=1, compare=max):
     rating = 0
     _data = data.copy()
     for x in range(data.shape[1]):
@@ -22,10 +29,128 @@ def component_rating(tie_break=1, compare=max):
         _data = _data[_data[:, x] == bit]
     return rating
 
-def life_support_rating():
+def life_support_rating(data):
+    """
+    >>> int(life_support_rating(load(StringIO(sample))))
+    230
+    """
     oxy_args, co2_args = (1, max), (0, min)
-    return component_rating(*oxy_args) * component_rating(*co2_args)
+    return component_rating(data, *oxy_args) * component_rating(data, *co2_args)
+
+
+def pack(f):
+    """
+    Read a report into one unsigned integer per row, returns (values, width).
+
+    >>> values, width = pack(StringIO(sample))
+    >>> values[:3], values.dtype, width
+    (array([ 4, 30, 22], dtype=uint8), dtype('uint8'), 5)
+    """
+    raw = f.read()
+    raw = raw.encode() if isinstance(raw, str) else raw
+    if not raw.endswith(b'\n'):
+        raw += b'\n'
+    width = raw.index(b'\n')
+    bits = np.frombuffer(raw, dtype=np.uint8).reshape(-1, width + 1)[:, :width]
+    return pack_bits(bits, width), width
+
+def pack_bits(bits, width):
+    dtype = np.min_scalar_type((1 << width) - 1)
+    values = np.zeros(len(bits), dtype=dtype)
+    for x in range(width):
+        values <<= dtype.type(1)
+        values |= (bits[:, x] == ord('1')).astype(dtype)
+    return values
+
+def column_ones(values, width):
+    one = values.dtype.type(1)
+    return [int(np.count_nonzero(values & (one << values.dtype.type(b)))) for b in reversed(range(width))]
+
+def gamma_times_epsilon(ones, rows):
+    gamma = 0
+    for n in ones:
+        gamma = (gamma << 1) + (2 * n >= rows)
+    return gamma * (gamma ^ ((1 << len(ones)) - 1))
+
+def power_consumption_packed(values, width):
+    """
+    >>> power_consumption_packed(*pack(StringIO(sample)))
+    198
+    """
+    return gamma_times_epsilon(column_ones(values, width), len(values))
+
+def component_rating_packed(values, width, keep_ones):
+    """
+    `values` must be sorted. Rows sharing the bits chosen so far form one
+    contiguous range of the sorted array, within which rows with the next
+    bit unset sort first, so each bit costs one binary search.
+    """
+    lo, hi, prefix = 0, len(values), 0
+    for b in reversed(range(width)):
+        if hi - lo == 1:
+            break
+        split = lo + int(np.searchsorted(values[lo:hi], prefix | (1 << b)))
+        ones, zeros = hi - split, split - lo
+        if zeros == 0 or (ones and keep_ones(ones, zeros)):
+            lo, prefix = split, prefix | (1 << b)
+        else:
+            hi = split
+    return int(values[lo])
+
+def life_support_rating_packed(values, width):
+    """
+    >>> life_support_rating_packed(*pack(StringIO(sample)))
+    230
+    """
+    values = np.sort(values)
+    oxygen = component_rating_packed(values, width, lambda ones, zeros: ones >= zeros)
+    co2 = component_rating_packed(values, width, lambda ones, zeros: ones < zeros)
+    return oxygen * co2
+
+def stream_column_ones(f, block=1 << 24):
+    """
+    Count ones per column reading `f` (opened in binary mode) about `block`
+    bytes at a time, returns (ones, rows). A partial row left at the end
+    of a short read is carried over to the next one.
+
+    >>> from io import BytesIO
+    >>> stream_column_ones(BytesIO(sample.encode()), block=16)
+    ([7, 5, 8, 7, 5], 12)
+    >>> class Trickle(BytesIO):
+    ...     def read(self, n=-1):
+    ...         return super().read(min(n, 7))
+    >>> stream_column_ones(Trickle(sample.rstrip('\\n').encode()), block=16)
+    ([7, 5, 8, 7, 5], 12)
+    """
+    rest = f.readline()
+    width = len(rest.rstrip(b'\n'))
+    ones = np.zeros(width, dtype=np.int64)
+    rows = 0
+    size = max(block // (width + 1), 1) * (width + 1)
+    while True:
+        chunk = f.read(size)
+        chunk, done = rest + chunk, not chunk
+        if done and chunk and not chunk.endswith(b'\n'):
+            chunk += b'\n'
+        full = len(chunk) - len(chunk) % (width + 1)
+        lines = np.frombuffer(chunk, dtype=np.uint8, count=full).reshape(-1, width + 1)
+        ones += np.count_nonzero(lines[:, :width] == ord('1'), axis=0)
+        rows += len(lines)
+        rest = chunk[full:]
+        if done:
+            return ones.tolist(), rows
+
+def power_consumption_stream(f, block=1 << 24):
+    """
+    >>> from io import BytesIO
+    >>> power_consumption_stream(BytesIO(sample.encode()), block=16)
+    198
+    """
+    return gamma_times_epsilon(*stream_column_ones(f, block))
 
 if __name__ == '__main__':
-    print(f'part 1: {power_consumption()}')
-    print(f'part 1: {life_support_rating()}')
+    with open('./input/day_03.txt', 'rb') as f:
+        print(f'part 1: {power_consumption_stream(f)}')
+    with open('./input/day_03.txt', 'rb') as f:
+        values, width = pack(f)
+    print(f'part 2: {life_support_rating_packed(values, width)}')
@@ -1,12 +1,14 @@
 import numpy as np
 from io import StringIO
 from itertools import product
-from copy import deepcopy
 
 
 class Card:
     def __init__(self, card_fh):
-        self.card = np.loadtxt(card_fh, dtype=int)
+        if isinstance(card_fh, np.ndarray):
+            self.card = card_fh
+        else:
+            self.card = np.loadtxt(card_fh, dtype=int)
         self.matches = np.zeros(self.card.shape, dtype=bool)
         self.numbers = {}
         for y, x in product(range(self.card.shape[0]), repeat=2):
@@ -28,28 +30,169 @@ class Card:
 
 
 def load(fname):
-    with open(fname, 'r') as f:
-        numbers = list(map(int, next(f).strip('\n').split(',')))
-        cards = set()
-        while raw_card := f.read(76):
-            cards.add(Card(StringIO(raw_card)))
-    return numbers, cards
+    numbers, boards = load_boards(fname)
+    return numbers, set(map(Card, boards))
+
+def parse_integers(buf):
+    """
+    Every run of ASCII digits in a uint8 buffer, as one int64 array, along
+    with the offset of the byte ending each run. Bytes below '0' wrap
+    around in the uint8 subtraction, so one comparison finds the digits.
+
+    >>> parse_integers(np.frombuffer(b' 7 13\\n\\n 22  0', dtype=np.uint8))
+    (array([ 7, 13, 22,  0]), array([ 1,  4,  9, 12]))
+    """
+    digits = buf - np.uint8(ord('0'))
+    idx = np.flatnonzero(digits < 10)
+    if len(idx) == 0:
+        return np.zeros(0, dtype=np.int64), idx
+    run_start = np.ones(len(idx), dtype=bool)
+    run_start[1:] = np.diff(idx) > 1
+    starts = np.flatnonzero(run_start)
+    stops = np.append(starts[1:], len(idx)) - 1
+    run = np.cumsum(run_start) - 1
+    weights = 10 ** (idx[stops][run] - idx)
+    return np.add.reduceat(digits[idx] * weights, starts), idx[stops]
+
+def next_line_break(buf, start, block=1 << 20):
+    """Offset of the first newline at or after `start`, len(buf) if none."""
+    for pos in range(start, len(buf), block):
+        breaks = np.flatnonzero(buf[pos:pos + block] == ord('\n'))
+        if len(breaks):
+            return pos + int(breaks[0])
+    return len(buf)
+
+def line_blocks(buf, start, block=1 << 20):
+    """Yield (start, stop) spans of `buf` of about `block` bytes, each ending on a line break."""
+    while start < len(buf):
+        stop = start + block
+        while stop < len(buf):
+            breaks = np.flatnonzero(buf[stop - block:stop] == ord('\n'))
+            if len(breaks):
+                stop += int(breaks[-1]) + 1 - block
+                break
+            stop += block
+        stop = min(stop, len(buf))
+        yield start, stop
+        start = stop
+
+def parse_boards(buf, block=1 << 20):
+    """
+    Parse a bingo file held in a uint8 buffer, returns (numbers, boards)
+    with boards shaped (cards, size, size). The buffer is parsed about
+    `block` bytes at a time so temporaries stay bounded when it is memory
+    mapped. The board size is taken from the number of values on the first
+    board row.
+
+    >>> numbers, boards = parse_boards(np.frombuffer(sample.encode(), dtype=np.uint8))
+    >>> len(numbers), boards.shape, boards[1, 2].tolist()
+    (27, (3, 5, 5), [19, 8, 7, 25, 23])
+    >>> small = parse_boards(np.frombuffer(sample.encode(), dtype=np.uint8), block=8)
+    >>> small[0] == numbers, np.array_equal(small[1], boards)
+    (True, True)
+    """
+    header = next_line_break(buf, 0, block)
+    numbers = parse_integers(buf[:header])[0].tolist()
+    size, cells = None, []
+    for start, stop in line_blocks(buf, header + 1, block):
+        values, ends = parse_integers(buf[start:stop])
+        if size is None and len(ends):
+            row_end = next_line_break(buf, start + int(ends[0]), block)
+            size = int(np.count_nonzero(start + ends < row_end))
+        cells.append(values)
+    return numbers, np.concatenate(cells).reshape(-1, size, size)
+
+def load_boards(fname, mmap=False, block=1 << 20):
+    """Parse a bingo file, optionally reading it through a memory map."""
+    if mmap:
+        buf = np.memmap(fname, dtype=np.uint8, mode='r')
+    else:
+        buf = np.fromfile(fname, dtype=np.uint8)
+    return parse_boards(buf, block)
+
+sample = (
+    '7,4,9,5,11,17,23,2,0,14,21,24,10,16,13,6,15,25,12,22,18,20,8,19,3,26,1\n'
+    '\n'
+    '22 13 17 11  0\n'
+    ' 8  2 23  4 24\n'
+    '21  9 14 16  7\n'
+    ' 6 10  3 18  5\n'
+    ' 1 12 20 15 19\n'
+    '\n'
+    ' 3 15  0  2 22\n'
+    ' 9 18 13 17  5\n'
+    '19  8  7 25 23\n'
+    '20 11 10 24  4\n'
+    '14 21 16 12  6\n'
+    '\n'
+    '14 21 17 24  4\n'
+    '10 16 15  9 19\n'
+    '18  8 23 26 20\n'
+    '22 11 13  6  5\n'
+    ' 2  0 12  3  7'
+)
+
+
+class Tournament:
+    """
+    All boards of a game in one (cards, size, size) array.
+
+    >>> numbers, *raw_cards = sample.split('\\n\\n')
+    >>> numbers = list(map(int, numbers.split(',')))
+    >>> t = Tournament.from_cards(Card(StringIO(c)) for c in raw_cards)
+    >>> t.first_and_last(numbers)
+    ((2, 24, 4512), (1, 13, 1924))
+    """
+    def __init__(self, boards):
+        self.boards = np.asarray(boards)
+        n, size, _ = self.boards.shape
+        self.size = size
+        flat = self.boards.reshape(-1)
+        self.order = np.argsort(flat, kind='stable')
+        self.sorted_numbers = flat[self.order]
+        self.row_hits = np.zeros((n, size), dtype=np.int32)
+        self.col_hits = np.zeros((n, size), dtype=np.int32)
+        self.unmarked = self.boards.sum(axis=(1, 2), dtype=np.int64)
+        self.won = np.zeros(n, dtype=bool)
+
+    @classmethod
+    def from_cards(cls, cards):
+        return cls(np.stack([c.card for c in cards]))
+
+    def positions(self, number):
+        lo, hi = np.searchsorted(self.sorted_numbers, (number, number + 1))
+        card, cell = np.divmod(self.order[lo:hi], self.size * self.size)
+        return card, *np.divmod(cell, self.size)
+
+    def draw(self, number):
+        """Mark `number` on every board, returns indices of boards that just won."""
+        card, row, col = self.positions(number)
+        np.add.at(self.row_hits, (card, row), 1)
+        np.add.at(self.col_hits, (card, col), 1)
+        np.subtract.at(self.unmarked, card, number)
+        full = (self.row_hits[card, row] == self.size) | (self.col_hits[card, col] == self.size)
+        winners = np.unique(card[full & ~self.won[card]])
+        self.won[winners] = True
+        return winners
+
+    def play(self, numbers):
+        """Yield (card, number, score) for every board in the order they win."""
+        for n in numbers:
+            for card in self.draw(n):
+                yield int(card), n, int(self.unmarked[card]) * n
+            if self.won.all():
+                return
+
+    def first_and_last(self, numbers):
+        first = last = None
+        for result in self.play(numbers):
+            first = first or result
+            last = result
+        return first, last
+
 
 if __name__ == '__main__':
-    numbers, cards = load('./input/day_04.txt')
-    for n, c in product(numbers, deepcopy(cards)):
-        c.mark(n)
-        if c.has_won():
-            break
-    print(f'part 1: {c.score(n)}')
-
-    for n in numbers:
-        to_remove = set()
-        for c in cards:
-            c.mark(n)
-            if c.has_won():
-                to_remove.add(c)
-        cards -= to_remove
-        if len(cards) == 0:
-            break
-    print(f'part 2: {c.score(n)}')
\ No newline at end of file
+    numbers, boards = load_boards('./input/day_04.txt', mmap=True)
+    first, last = Tournament(boards).first_and_last(numbers)
+    print(f'part 1: {first[2]}')
+    print(f'part 2: {last[2]}')
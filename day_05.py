@@ -1,16 +1,30 @@
 from collections import defaultdict as dd
+from bisect import bisect_left, bisect_right
+from itertools import combinations
+from io import StringIO
+import numpy as np
 import re
 
 pat = re.compile(r'(\d+),(\d+) -> (\d+),(\d+)$')
 
-with open('./input/day_05.txt', 'r') as f:
-    data = [tuple(map(int, pat.match(line).groups())) for line in f]
+sample = (
+    '0,9 -> 5,9\n8,0 -> 0,8\n9,4 -> 3,4\n2,2 -> 2,1\n7,0 -> 7,4\n'
+    '6,4 -> 2,0\n0,9 -> 2,9\n3,4 -> 1,4\n0,0 -> 8,8\n5,5 -> 8,2'
+)
+
+def load(f):
+    return [tuple(map(int, pat.match(line).groups())) for line in f]
 
 def natural_range(a, b):
     step = 1 if b >= a else -1
     return range(a, b + step, step)
 
-def overlaps(count_diagonal=False):
+def overlaps(data, count_diagonal=False):
+    """
+    >>> data = load(StringIO(sample))
+    >>> overlaps(data), overlaps(data, count_diagonal=True)
+    (5, 12)
+    """
     diagram = dd(int)
     for src_x, src_y, dst_x, dst_y in data:
         if src_x == dst_x:
@@ -25,6 +39,211 @@ def overlaps(count_diagonal=False):
                 diagram[(x, y)] += 1
     return len([v for v in diagram.values() if v > 1])
 
+def rasterize(data, count_diagonal=False):
+    """
+    Linear cell indices of every point on every segment, along with the
+    (min_x, min_y, width, height) bounding box they index into.
+    """
+    segments = np.asarray(data, dtype=np.int64).reshape(-1, 4)
+    src_x, src_y, dst_x, dst_y = segments.T
+    dx, dy = dst_x - src_x, dst_y - src_y
+    keep = (dx == 0) | (dy == 0)
+    if count_diagonal:
+        keep |= np.abs(dx) == np.abs(dy)
+    src_x, src_y, dx, dy = src_x[keep], src_y[keep], dx[keep], dy[keep]
+    lengths = np.maximum(np.abs(dx), np.abs(dy)) + 1
+    seg = np.repeat(np.arange(len(lengths)), lengths)
+    t = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    xs = src_x[seg] + np.sign(dx)[seg] * t
+    ys = src_y[seg] + np.sign(dy)[seg] * t
+    if len(xs) == 0:
+        return xs, (0, 0, 0, 0)
+    min_x, min_y = xs.min(), ys.min()
+    width, height = xs.max() - min_x + 1, ys.max() - min_y + 1
+    return (ys - min_y) * width + (xs - min_x), (min_x, min_y, width, height)
+
+def overlaps_grid(data, count_diagonal=False, max_cells=1 << 26):
+    """
+    Same as overlaps, counting in a dense grid when the bounding box has at
+    most `max_cells` cells and over sorted unique indices otherwise.
+
+    >>> data = load(StringIO(sample))
+    >>> overlaps_grid(data), overlaps_grid(data, count_diagonal=True)
+    (5, 12)
+    >>> overlaps_grid(data, count_diagonal=True, max_cells=0)
+    12
+    """
+    cells, (_, _, width, height) = rasterize(data, count_diagonal)
+    if width * height <= max_cells:
+        counts = np.bincount(cells, minlength=width * height)
+    else:
+        _, counts = np.unique(cells, return_counts=True)
+    return int(np.count_nonzero(counts > 1))
+
+# Segment families as (key, position on the line) pairs: every family is a
+# set of parallel lines, a segment is an interval of t on the line `key`.
+key_of = {'v': lambda x, y: x, 'h': lambda x, y: y, 'd1': lambda x, y: x - y, 'd2': lambda x, y: x + y}
+param_of = {'v': lambda x, y: y, 'h': lambda x, y: x, 'd1': lambda x, y: x, 'd2': lambda x, y: x}
+point_on = {
+    'v': lambda key, t: (key, t),
+    'h': lambda key, t: (t, key),
+    'd1': lambda key, t: (t, t - key),
+    'd2': lambda key, t: (t, key - t),
+}
+
+def families(data, count_diagonal=False):
+    lines = {f: dd(list) for f in ('v', 'h', 'd1', 'd2')}
+    for src_x, src_y, dst_x, dst_y in data:
+        if src_x == dst_x:
+            family = 'v'
+        elif src_y == dst_y:
+            family = 'h'
+        elif count_diagonal:
+            family = 'd1' if (dst_x - src_x) == (dst_y - src_y) else 'd2'
+        else:
+            continue
+        key, ts = key_of[family](src_x, src_y), (param_of[family](src_x, src_y), param_of[family](dst_x, dst_y))
+        lines[family][key].append((min(ts), max(ts)))
+    return lines
+
+def covered(intervals, times=1):
+    """
+    Merged, sorted (start, end) ranges of cells covered by at least `times`
+    of the inclusive integer intervals.
+
+    >>> covered([(0, 3), (2, 5), (4, 4), (7, 8)])
+    [(0, 5), (7, 8)]
+    >>> covered([(0, 3), (2, 5), (4, 4), (7, 8)], times=2)
+    [(2, 4)]
+    """
+    events = sorted([(a, 1) for a, _ in intervals] + [(b + 1, -1) for _, b in intervals])
+    out, depth, start = [], 0, None
+    for t, d in events:
+        depth += d
+        if depth >= times and start is None:
+            start = t
+        elif depth < times and start is not None:
+            if out and out[-1][1] == start - 1:
+                start = out.pop()[0]
+            if t > start:
+                out.append((start, t - 1))
+            start = None
+    return out
+
+
+class Fenwick:
+    def __init__(self, n):
+        self.tree = [0] * (n + 1)
+        self.log = n.bit_length()
+
+    def add(self, i, delta):
+        i += 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, i):
+        """Sum of the first i entries."""
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def find(self, k):
+        """Smallest index whose prefix sum reaches k."""
+        pos = 0
+        for b in reversed(range(self.log + 1)):
+            step = pos + (1 << b)
+            if step < len(self.tree) and self.tree[step] < k:
+                pos = step
+                k -= self.tree[step]
+        return pos
+
+
+def crossings(f_lines, g_lines, f, g):
+    """
+    Yield every lattice point where a segment of family `f` meets one of
+    family `g`, sweeping over f-keys with the active g-keys in a Fenwick
+    tree, so each reported crossing costs O(log n). Crossings of the two
+    diagonal families off the lattice are reported and skipped.
+    """
+    def g_key_along(key, t):
+        return key_of[g](*point_on[f](key, t))
+
+    f_segments, g_segments = [], []
+    for key, intervals in f_lines.items():
+        for a, b in intervals:
+            lo, hi = sorted((g_key_along(key, a), g_key_along(key, b)))
+            f_segments.append((key, lo, hi, a))
+    for key, intervals in g_lines.items():
+        for a, b in intervals:
+            lo, hi = sorted((key_of[f](*point_on[g](key, a)), key_of[f](*point_on[g](key, b))))
+            g_segments.append((key, lo, hi))
+    g_keys = sorted(set(k for k, _, _ in g_segments))
+    if not g_keys:
+        return
+    index = {k: i for i, k in enumerate(g_keys)}
+    events = [(lo, 0, key) for key, lo, _ in g_segments]
+    events += [(hi, 2, key) for key, _, hi in g_segments]
+    events += [(key, 1, seg) for key, *seg in f_segments]
+    events.sort(key=lambda e: e[:2])
+    active = Fenwick(len(g_keys))
+    for f_key, kind, item in events:
+        if kind == 0:
+            active.add(index[item], 1)
+        elif kind == 2:
+            active.add(index[item], -1)
+        else:
+            lo, hi, a = item
+            below = active.prefix(bisect_left(g_keys, lo))
+            found = active.prefix(bisect_right(g_keys, hi)) - below
+            step = g_key_along(f_key, a + 1) - g_key_along(f_key, a)
+            for j in range(found):
+                g_key = g_keys[active.find(below + j + 1)]
+                t, rem = divmod(g_key - g_key_along(f_key, 0), step)
+                if rem == 0:
+                    yield point_on[f](f_key, t)
+
+def overlaps_sweep(data, count_diagonal=False):
+    """
+    Same as overlaps, working on segment endpoints only, in
+    O((n + k) log n) for n segments and k crossings.
+
+    Cells covered twice within one family of parallel lines are summed per
+    line, then every crossing between two families is added once unless
+    it was already counted that way.
+
+    >>> data = load(StringIO(sample))
+    >>> overlaps_sweep(data), overlaps_sweep(data, count_diagonal=True)
+    (5, 12)
+    >>> overlaps_sweep([(0, 0, 10**9, 10**9), (0, 10**9, 10**9, 0), (5, 5, 10**9 - 5, 10**9 - 5)], True)
+    999999991
+    """
+    lines = families(data, count_diagonal)
+    unions, doubles, total = {}, {}, 0
+    for family, by_key in lines.items():
+        unions[family] = {key: covered(ranges) for key, ranges in by_key.items()}
+        doubles[family] = {}
+        for key, ranges in by_key.items():
+            if twice := covered(ranges, times=2):
+                doubles[family][key] = ([a for a, _ in twice], [b for _, b in twice])
+                total += sum(b - a + 1 for a, b in twice)
+
+    def counted_twice(family, x, y):
+        starts, ends = doubles[family].get(key_of[family](x, y), ((), ()))
+        i = bisect_right(starts, param_of[family](x, y)) - 1
+        return i >= 0 and ends[i] >= param_of[family](x, y)
+
+    points = set()
+    for f, g in combinations(unions, 2):
+        points.update(crossings(unions[f], unions[g], f, g))
+    for x, y in points:
+        total += 1 - sum(counted_twice(family, x, y) for family in doubles)
+    return total
+
 if __name__ == '__main__':
-    print(f'part 1: {overlaps()}')
-    print(f'part 2: {overlaps(count_diagonal=True)}')
+    with open('./input/day_05.txt', 'r') as f:
+        data = load(f)
+    print(f'part 1: {overlaps_grid(data)}')
+    print(f'part 2: {overlaps_grid(data, count_diagonal=True)}')
@@ -1,20 +1,158 @@
-with open('./input/day_06.txt', 'r') as f:
-    school = [(1, x) for x in map(int, f.read().strip('\n').split(','))]
+from io import StringIO
+import numpy as np
 
-def run(n):
+RESET, NEWBORN = 6, 8
+
+def load(f):
+    return list(map(int, f.read().strip('\n').split(',')))
+
+def run(ages, n, reset=RESET, newborn=NEWBORN):
+    """
+    >>> ages = load(StringIO('3,4,3,1,2'))
+    >>> run(ages, 18), run(ages, 80)
+    (26, 5934)
+    """
+    school = [(1, x) for x in ages]
     for _ in range(n):
         new_fish = 0
         for i, (amount, age) in enumerate(school):
             age -= 1
             if age < 0:
-                age = 6
+                age = reset
                 new_fish += amount
             school[i] = (amount, age)
         if new_fish:
-            school.append((new_fish, 8))
+            school.append((new_fish, newborn))
     return sum(map(lambda x: x[0], school))
 
+def buckets(ages, newborn=NEWBORN):
+    counts = [0] * (newborn + 1)
+    for age in ages:
+        counts[age] += 1
+    return counts
+
+def step_buckets(counts, reset=RESET):
+    spawning = counts[0]
+    counts = counts[1:] + [spawning]
+    counts[reset] += spawning
+    return counts
+
+def run_buckets(ages, n, reset=RESET, newborn=NEWBORN):
+    """
+    >>> ages = load(StringIO('3,4,3,1,2'))
+    >>> run_buckets(ages, 18), run_buckets(ages, 80), run_buckets(ages, 256)
+    (26, 5934, 26984457539)
+    """
+    counts = buckets(ages, newborn)
+    for _ in range(n):
+        counts = step_buckets(counts, reset)
+    return sum(counts)
+
+def mat_mul(a, b, mod=None):
+    out = [[sum(x * y for x, y in zip(row, col)) for col in zip(*b)] for row in a]
+    if mod:
+        out = [[v % mod for v in row] for row in out]
+    return out
+
+def mat_pow(m, n, mod=None):
+    result = [[int(i == j) for j in range(len(m))] for i in range(len(m))]
+    while n:
+        if n & 1:
+            result = mat_mul(result, m, mod)
+        m = mat_mul(m, m, mod)
+        n >>= 1
+    return result
+
+def transition(reset=RESET, newborn=NEWBORN):
+    """One day as a matrix over the age buckets: new[i] = sum(m[i][j] * old[j])."""
+    size = newborn + 1
+    m = [[0] * size for _ in range(size)]
+    for age in range(1, size):
+        m[age - 1][age] = 1
+    m[reset][0] += 1
+    m[newborn][0] += 1
+    return m
+
+def population(ages, n, mod=None, reset=RESET, newborn=NEWBORN):
+    """
+    Population after n days in O(log n) matrix products on exact integers.
+    The population grows about 9% a day, so the exact answer for n = 10**12
+    has tens of billions of digits; pass `mod` to get it modulo a number.
+
+    >>> ages = load(StringIO('3,4,3,1,2'))
+    >>> population(ages, 80), population(ages, 256)
+    (5934, 26984457539)
+    >>> population(ages, 256, mod=10**9 + 7) == population(ages, 256) % (10**9 + 7)
+    True
+    >>> population(ages, 10 ** 12, mod=10**9 + 7) < 10**9 + 7
+    True
+    """
+    counts = buckets(ages, newborn)
+    m = mat_pow(transition(reset, newborn), n, mod)
+    total = sum(sum(row[j] * counts[j] for j in range(len(counts))) for row in m)
+    return total % mod if mod else total
+
+
+class GrowthTable:
+    """
+    Descendants of a single fish of every starting age after each horizon,
+    computed once per reproduction rule. A school is then a vector of
+    bucket counts and each query is a dot product with one table row.
+
+    >>> table = GrowthTable([18, 80, 256])
+    >>> table.query(load(StringIO('3,4,3,1,2')), 256)
+    26984457539
+    >>> table.batch([[3, 4, 3, 1, 2], [0], [8, 8]]).tolist()
+    [[26, 5934, 26984457539], [7, 1421, 6703087164], [8, 1536, 6738373556]]
+    >>> GrowthTable([10], reset=2, newborn=4).query([0], 10) == run([0], 10, reset=2, newborn=4)
+    True
+
+    Products that could pass the int64 range are summed on Python ints.
+
+    >>> GrowthTable([440]).query([3] * 300, 440) == population([3] * 300, 440)
+    True
+    """
+    def __init__(self, horizons, reset=RESET, newborn=NEWBORN):
+        self.reset, self.newborn = reset, newborn
+        self.horizons = sorted(set(horizons))
+        self.index = {h: i for i, h in enumerate(self.horizons)}
+        m = transition(reset, newborn)
+        rows, row, day = [], [[1] * (newborn + 1)], 0
+        for h in self.horizons:
+            row = mat_mul(row, mat_pow(m, h - day))
+            rows.append(row[0])
+            day = h
+        dtype = np.int64 if max(map(max, rows), default=0) < 2 ** 63 else object
+        self.table = np.array(rows, dtype=dtype).reshape(len(rows), newborn + 1)
+
+    def counts(self, schools):
+        out = np.zeros((len(schools), self.newborn + 1), dtype=np.int64)
+        for i, ages in enumerate(schools):
+            out[i] = buckets(ages, self.newborn)
+        return out
+
+    def populations(self, counts, rows):
+        """
+        counts @ rows.T, on Python ints unless every sum is bounded by the
+        largest table entry times the largest school and that fits in int64.
+        """
+        if rows.dtype != object and int(rows.max(initial=0)) * int(counts.sum(axis=1).max(initial=0)) >= 2 ** 63:
+            rows = rows.astype(object)
+        if rows.dtype == object:
+            counts = counts.astype(object)
+        return counts @ rows.T
+
+    def query(self, ages, horizon):
+        return int(self.populations(self.counts([ages]), self.table[[self.index[horizon]]])[0, 0])
+
+    def batch(self, schools, horizons=None):
+        """Populations as a (schools, horizons) matrix, all horizons by default."""
+        rows = self.table if horizons is None else self.table[[self.index[h] for h in horizons]]
+        return self.populations(self.counts(schools), rows)
+
 
 if __name__ == '__main__':
-    print(f'part 1: {run(80)}')
-    print(f'part 2: {run(256-80)}')
+    with open('./input/day_06.txt', 'r') as f:
+        ages = load(f)
+    print(f'part 1: {population(ages, 80)}')
+    print(f'part 2: {population(ages, 256)}')
@@ -1,5 +1,6 @@
 from io import StringIO
 from collections import Counter
+import numpy as np
 
 def load(h):
     return list(map(int, h.read().strip('\n').split(',')))
@@ -15,7 +16,7 @@ def progression(n):
     >>> progression(3)
     6
     """
-    return sum(range(1, n+1))
+    return n * (n + 1) // 2
 
 def alignment_cost(positions, cost_func=lambda x: x):
     """
@@ -36,8 +37,189 @@ def alignment_cost(positions, cost_func=lambda x: x):
         min_cost = min(min_cost, cost)
     return min_cost
 
+class Fleet:
+    """
+    Crab positions as a histogram with prefix counts and sums, so that the
+    linear or triangular cost of any alignment position is O(1).
+
+    >>> fleet = Fleet(load(StringIO('16,1,2,0,4,2,7,1,2,14')))
+    >>> fleet.linear_cost(2), fleet.triangular_cost(5), fleet.triangular_cost(2)
+    (37, 168, 206)
+    >>> fleet.best_linear(), fleet.best_triangular()
+    ((2, 37), (5, 168))
+    """
+    def __init__(self, positions):
+        positions = np.asarray(positions, dtype=np.int64)
+        offset = int(positions.min())
+        self.index(np.bincount(positions - offset), offset)
+
+    @classmethod
+    def from_histogram(cls, counts, offset=0):
+        fleet = cls.__new__(cls)
+        fleet.index(np.asarray(counts, dtype=np.int64), offset)
+        return fleet
+
+    def index(self, counts, offset):
+        self.offset = offset
+        self.count_le = np.cumsum(counts)
+        self.sum_le = np.cumsum(counts * np.arange(len(counts)))
+        self.n = int(self.count_le[-1])
+        self.total = int(self.sum_le[-1])
+        occupied = np.flatnonzero(counts)
+        self.squares = sum(c * v * v for v, c in zip(occupied.tolist(), counts[occupied].tolist()))
+
+    def prefix(self, i):
+        if i < 0:
+            return 0, 0
+        i = min(i, len(self.count_le) - 1)
+        return int(self.count_le[i]), int(self.sum_le[i])
+
+    def linear_cost(self, pos):
+        i = pos - self.offset
+        c, s = self.prefix(i)
+        return (i * c - s) + (self.total - s) - i * (self.n - c)
+
+    def triangular_cost(self, pos):
+        i = pos - self.offset
+        squares = self.n * i * i - 2 * i * self.total + self.squares
+        return (squares + self.linear_cost(pos)) // 2
+
+    def best_linear(self):
+        median = int(np.searchsorted(self.count_le, (self.n + 1) // 2)) + self.offset
+        return median, self.linear_cost(median)
+
+    def best_triangular(self):
+        # the real-valued optimum lies within 1/2 of the mean
+        mean = self.offset + self.total // self.n
+        candidates = range(max(mean - 1, self.offset), min(mean + 2, self.offset + len(self.count_le) - 1) + 1)
+        return min(((p, self.triangular_cost(p)) for p in candidates), key=lambda x: x[1])
+
+def ternary_alignment_cost(positions, cost_func=lambda x: x):
+    """
+    Cheapest alignment for any convex `cost_func`, found by ternary search
+    over the position range, returns (position, cost).
+
+    >>> positions = load(StringIO('16,1,2,0,4,2,7,1,2,14'))
+    >>> ternary_alignment_cost(positions), ternary_alignment_cost(positions, progression)
+    ((2, 37), (5, 168))
+    >>> ternary_alignment_cost(positions, lambda d: d * d)
+    (5, 291)
+    """
+    c = Counter(positions)
+
+    def cost(pos):
+        return sum(cost_func(abs(pos - sub_pos)) * cnt for sub_pos, cnt in c.items())
+
+    lo, hi = min(c.keys()), max(c.keys())
+    while hi - lo > 2:
+        m1, m2 = lo + (hi - lo) // 3, hi - (hi - lo) // 3
+        c1, c2 = cost(m1), cost(m2)
+        if c1 < c2:
+            hi = m2 - 1
+        elif c1 > c2:
+            lo = m1 + 1
+        else:
+            lo, hi = m1, m2
+    return min(((p, cost(p)) for p in range(lo, hi + 1)), key=lambda x: x[1])
+
+def load_blocks(h, block=1 << 24):
+    """
+    Parse a comma separated position file about `block` characters at a
+    time, yielding one int64 array per block.
+
+    >>> [b.tolist() for b in load_blocks(StringIO('16,1,2,0,4,2,7,1,2,14\\n'), block=5)]
+    [[16, 1], [2, 0], [4, 2, 7], [1, 2], [14]]
+    """
+    rest = ''
+    while chunk := h.read(block):
+        chunk = rest + chunk
+        cut = chunk.rfind(',')
+        if cut < 0:
+            rest = chunk
+            continue
+        chunk, rest = chunk[:cut], chunk[cut + 1:]
+        yield np.fromstring(chunk, dtype=np.int64, sep=',')
+    if rest.strip():
+        yield np.fromstring(rest, dtype=np.int64, sep=',')
+
+
+class StreamingFleet:
+    """
+    Histogram of crab positions with at most `max_buckets` buckets, counted
+    from the smallest position seen so far. Buckets start one position wide
+    and double in width whenever the positions do not fit, so the answer is
+    exact while the range of positions stays below `max_buckets`.
+
+    >>> fleet = StreamingFleet()
+    >>> for block in load_blocks(StringIO('16,1,2,0,4,2,7,1,2,14'), block=4):
+    ...     fleet.add(block)
+    >>> fleet.best_linear()
+    (2, 37, 0)
+
+    A narrow range far from zero is still counted one position per bucket,
+    also when later blocks reach below the first one.
+
+    >>> fleet = StreamingFleet(max_buckets=1024)
+    >>> fleet.add(np.arange(1_000_005, 1_000_010))
+    >>> fleet.add(np.arange(1_000_000, 1_000_005))
+    >>> fleet.width, fleet.best_linear()
+    (1, (1000004, 25, 0))
+
+    With fewer buckets than positions the cost is within the returned error
+    of the optimal cost.
+
+    >>> fleet = StreamingFleet(max_buckets=4)
+    >>> fleet.add(load(StringIO('16,1,2,0,4,2,7,1,2,14')))
+    >>> fleet.width, fleet.best_linear()
+    (8, (0, 24, 70))
+    """
+    def __init__(self, max_buckets=1 << 24):
+        self.max_buckets = max_buckets
+        self.width = 1
+        self.offset = None
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def add(self, positions):
+        positions = np.asarray(positions, dtype=np.int64)
+        if len(positions) == 0:
+            return
+        lo, hi = int(positions.min()), int(positions.max())
+        if self.offset is None:
+            self.offset = lo
+        hi = max(hi, self.offset + len(self.counts) * self.width - 1)
+        while True:
+            start = self.offset + min(lo - self.offset, 0) // self.width * self.width
+            if (hi - start) // self.width < self.max_buckets:
+                break
+            if len(self.counts) % 2:
+                self.counts = np.append(self.counts, 0)
+            self.counts = self.counts.reshape(-1, 2).sum(axis=1)
+            self.width *= 2
+        if start < self.offset:
+            self.counts = np.concatenate([np.zeros((self.offset - start) // self.width, dtype=np.int64), self.counts])
+            self.offset = start
+        counts = np.bincount((positions - self.offset) // self.width)
+        if len(counts) > len(self.counts):
+            counts[:len(self.counts)] += self.counts
+            self.counts = counts
+        else:
+            self.counts[:len(counts)] += counts
+
+    def best_linear(self):
+        """
+        Returns (position, cost, error) with |cost - optimal cost| <= error.
+
+        Every crab lies at most width - 1 positions from its bucket start,
+        so the bucket-level cost of any position is off by at most
+        n * (width - 1).
+        """
+        bucket, cost = Fleet.from_histogram(self.counts).best_linear()
+        n = int(self.counts.sum())
+        return self.offset + bucket * self.width, cost * self.width, n * (self.width - 1)
+
 if __name__ == '__main__':
     with open('./input/day_07.txt', 'r') as f:
         positions = load(f)
-    print(f'part 1: {alignment_cost(positions)}')
-    print(f'part 2: {alignment_cost(positions, progression)}')
\ No newline at end of file
+    fleet = Fleet(positions)
+    print(f'part 1: {fleet.best_linear()[1]}')
+    print(f'part 2: {fleet.best_triangular()[1]}')
\ No newline at end of file
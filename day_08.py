@@ -1,11 +1,22 @@
 from collections import Counter
 from io import StringIO
-from itertools import chain, starmap, tee
+from itertools import chain, starmap, tee, islice
+from importlib import import_module
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from collections import deque
 from copy import copy
+from random import Random
+from time import perf_counter
+import argparse
+import os
+import tracemalloc
 
 digit_to_segments_count = {1: 2, 4: 4, 7: 3, 8: 7}
 segments_count_to_digit = {2: 1, 4: 4, 3: 7, 7: 8}
 
+# segments of each digit on a correctly wired display
+digit_segments = ('abcefg', 'cf', 'acdeg', 'acdfg', 'bcdf', 'abdfg', 'abdefg', 'acf', 'abcdefg', 'abcdfg')
+
 def load(h):
     out = []
     for line in h:
@@ -78,8 +89,150 @@ def decode_line(digits, number):
         out = out * 10 + sig2int[n]
     return out
 
+# decoder strategies by name, each module provides load, count_simple_digits
+# and decode_line; imported on first use so optional dependencies stay optional
+strategies = {
+    'iterative': 'day_08',
+    'optimized': 'day_08_optimized',
+    'constraint': 'day_08_constraint',
+    'lookup': 'day_08_lookup',
+}
+
+def get_strategy(name):
+    return import_module(strategies[name])
+
+def decode_all(name, lines):
+    strategy = get_strategy(name)
+    return list(starmap(strategy.decode_line, strategy.load(lines)))
+
+def cross_check(lines, names=None):
+    """
+    Decode the same lines with every strategy, returns the (line number,
+    {strategy: value}) pairs the strategies disagree on.
+
+    >>> cross_check(synthetic(50))
+    []
+    """
+    lines = list(lines)
+    results = {name: decode_all(name, lines) for name in names or strategies}
+    return [(i, dict(zip(results, values)))
+            for i, values in enumerate(zip(*results.values()))
+            if len(set(values)) > 1]
+
+def synthetic(n, seed=0):
+    """
+    n random display lines, each with its own wiring.
+
+    >>> decode_line(*load(synthetic(1, seed=3))[0])
+    9597
+    """
+    rnd = Random(seed)
+    lines = []
+    for _ in range(n):
+        wiring = dict(zip('abcdefg', rnd.sample('abcdefg', 7)))
+
+        def show(digit):
+            segments = [wiring[c] for c in digit_segments[digit]]
+            rnd.shuffle(segments)
+            return ''.join(segments)
+
+        patterns = [show(d) for d in rnd.sample(range(10), 10)]
+        value = [show(rnd.randrange(10)) for _ in range(4)]
+        lines.append(f"{' '.join(patterns)} | {' '.join(value)}\n")
+    return lines
+
+def benchmark(n=10000, names=None, seed=0):
+    lines = synthetic(n, seed)
+    for name in names or strategies:
+        get_strategy(name)
+        start = perf_counter()
+        total = sum(decode_all(name, lines))
+        elapsed = perf_counter() - start
+        # tracing slows each strategy by a different factor, so peak memory
+        # is measured on a separate pass
+        tracemalloc.start()
+        decode_all(name, lines)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f'{name:>10}: {n / elapsed:12.0f} lines/s, peak {peak / 2**20:8.2f} MiB, total {total}')
+
+def decode_chunk(name, lines):
+    """Part 1 and part 2 partial totals of a list of raw lines."""
+    strategy = get_strategy(name)
+    data = strategy.load(lines)
+    return strategy.count_simple_digits(data), sum(starmap(strategy.decode_line, data))
+
+def decode_stream(h, name='optimized', chunk_lines=10000, workers=None, ordered=True):
+    """
+    Decode a display log chunk by chunk in a process pool, yielding
+    (part 1, part 2) partial totals per chunk. At most two chunks per worker
+    are in flight, so memory stays bounded for any file size. Unordered mode
+    yields chunks as they finish.
+
+    >>> lines = synthetic(25)
+    >>> results = list(decode_stream(iter(lines), 'lookup', chunk_lines=10, workers=2))
+    >>> len(results), tuple(map(sum, zip(*results))) == decode_chunk('optimized', lines)
+    (3, True)
+    >>> sorted(decode_stream(iter(lines), chunk_lines=10, workers=2, ordered=False)) == sorted(results)
+    True
+    """
+    workers = workers or os.cpu_count()
+    limit = 2 * workers
+    with ProcessPoolExecutor(workers) as executor:
+        pending = deque() if ordered else set()
+        chunks = iter(lambda: list(islice(h, chunk_lines)), [])
+        for chunk in chunks:
+            if ordered:
+                pending.append(executor.submit(decode_chunk, name, chunk))
+                if len(pending) >= limit:
+                    yield pending.popleft().result()
+            else:
+                pending.add(executor.submit(decode_chunk, name, chunk))
+                if len(pending) >= limit:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    yield from (f.result() for f in done)
+        while pending:
+            if ordered:
+                yield pending.popleft().result()
+            else:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from (f.result() for f in done)
+
+def decode_totals(h, name='optimized', chunk_lines=10000, workers=None, ordered=False):
+    part_1, part_2 = 0, 0
+    for count, total in decode_stream(h, name, chunk_lines, workers, ordered):
+        part_1 += count
+        part_2 += total
+    return part_1, part_2
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Seven segment search')
+    parser.add_argument('strategy', nargs='?', default='optimized', choices=[*strategies, 'check', 'bench'])
+    parser.add_argument('--input', default='./input/day_08.txt')
+    parser.add_argument('--lines', type=int, default=10000, help='synthetic lines for bench')
+    parser.add_argument('--jobs', type=int, help='stream the input through this many processes')
+    args = parser.parse_args(argv)
+    if args.strategy == 'bench':
+        benchmark(args.lines)
+        return
+    if args.jobs:
+        if args.strategy not in strategies:
+            parser.error('--jobs needs a decoder strategy')
+        with open(args.input, 'r') as f:
+            part_1, part_2 = decode_totals(f, args.strategy, workers=args.jobs)
+        print(f'part 1: {part_1}')
+        print(f'part 2: {part_2}')
+        return
+    with open(args.input, 'r') as f:
+        lines = f.readlines()
+    if args.strategy == 'check':
+        for i, values in cross_check(lines):
+            print(f'line {i + 1}: {values}')
+        return
+    strategy = get_strategy(args.strategy)
+    data = strategy.load(lines)
+    print(f'part 1: {strategy.count_simple_digits(data)}')
+    print(f'part 2: {sum(starmap(strategy.decode_line, data))}')
+
 if __name__ == '__main__':
-    with open('./input/day_08.txt', 'r') as f:
-        data = load(f)
-    print(f'part 1: {count_simple_digits(data)}')
-    print(f'part 2: {sum(starmap(decode_line, data))}')
+    main()
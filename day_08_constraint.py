@@ -1,75 +1,95 @@
-from collections import Counter
 from io import StringIO
-from itertools import chain, starmap
-from constraint import Problem, ExactSumConstraint, AllDifferentConstraint
+from functools import lru_cache
+from constraint import Problem, Constraint, Domain, AllDifferentConstraint
 
-digit_to_segments_count = {1: 2, 4: 4, 7: 3, 8: 7}
-segments_count_to_digit = {2: 1, 4: 4, 3: 7, 7: 8}
+from day_08 import load, count_simple_digits, segments_count_to_digit
 
-def load(h):
-    out = []
-    for line in h:
-        patterns, value = line.strip('\n').split(' | ')
-        out.append((tuple(map(frozenset, patterns.split(' '))), tuple(map(frozenset, value.split(' ')))))
-    return out
 
-def count_simple_digits(data):
+class CandidateConstraint(Constraint):
     """
-    >>> h = StringIO(\
-    'be cfbegad cbdgef fgaecd cgeb fdcge agebfd fecdb fabcd edb | fdgacbe cefdb cefbgd gcbe\\n' \
-    'edbfga begcd cbg gc gcadebf fbgde acbgfd abcde gfcbed gfec | fcgedb cgb dgebacf gc\\n' \
-    'fgaebd cg bdaec gdafb agbcfd gdcbef bgcad gfac gcb cdgabef | cg cg fdcagb cbg\\n' \
-    'fbegcd cbd adcefb dageb afcb bc aefdc ecdab fgdeca fcdbega | efabcd cedba gadfec cb\\n' \
-    'aecbfdg fbg gf bafeg dbefa fcge gcbea fcaegb dgceab fcbdga | gecf egdcabf bgf bfgea\\n' \
-    'fgeab ca afcebg bdacfeg cfaedg gcfdb baec bfadeg bafgc acf | gebdcfa ecba ca fadegcb\\n' \
-    'dbcfg fgd bdegcaf fgec aegbdf ecdfab fbedc dacgb gdcebf gf | cefg dcbef fcge gbcadfe\\n' \
-    'bdfegc cbegaf gecbf dfcage bdacg ed bedf ced adcbefg gebcd | ed bcgafe cdgba cbgef\\n' \
-    'egadfb cdbfeg cegd fecab cgb gbdefca cg fgcdab egfdb bfceg | gbdfcae bgc cg cgb\\n' \
-    'gcafb gcf dcaebfg ecagb gf abcdeg gaef cafbge fdbac fegbdc | fgae cfgab fg bagce')
-    >>> count_simple_digits(load(h))
-    26
+    Restricts pattern i to the digits in candidates[i]. The dict is refilled
+    for every line, so preProcess swaps in fresh domains for the current
+    solve instead of pruning the problem's own ones.
     """
-    c = Counter(chain(*[[len(j) for j in i] for _, i in data]))
-    return sum([c[digit_to_segments_count[i]] for i in (1, 4, 7, 8)])
+    def __init__(self, candidates):
+        self.candidates = candidates
 
-def decode_line(digits, number):
+    def preProcess(self, variables, domains, constraints, vconstraints):
+        for variable in variables:
+            domains[variable] = Domain(self.candidates[variable])
+            vconstraints[variable].remove((self, variables))
+        constraints.remove((self, variables))
+
+    def __call__(self, variables, domains, assignments, forwardcheck=False):
+        return True
+
+
+# one problem over the ten pattern positions, reused for every line
+candidates = {}
+problem = Problem()
+problem.addVariables(range(10), range(10))
+problem.addConstraint(AllDifferentConstraint())
+problem.addConstraint(CandidateConstraint(candidates))
+
+@lru_cache(maxsize=4096)
+def solve(patterns):
     """
-    >>> h = StringIO('acedgfb cdfbe gcdfa fbcad dab cefabd cdfgeb eafb cagedb ab | cdfeb fcadb cdfeb cdbaf')
-    >>> decode_line(*(load(h)[0]))
-    5353
+    Digits of the ten sorted segment strings in `patterns`, cached since
+    real displays repeat their wiring. solve.cache_info() has the hit and
+    miss counters.
     """
-    p = Problem()
-    p.addConstraint(AllDifferentConstraint())
+    digits = tuple(map(frozenset, patterns))
+    int2sig = {}
 
     # register 1, 4, 7, 8 by known unique lengths
-    for d, len_d in zip(digits, map(len, digits)):
-        if len_d in segments_count_to_digit.keys():
-            p.addVariable(d, (segments_count_to_digit[len_d],))
+    for i, d in enumerate(digits):
+        if len(d) in segments_count_to_digit.keys():
+            candidates[i] = (segments_count_to_digit[len(d)],)
+            int2sig[candidates[i][0]] = d
 
     # https://github.com/mattvperry/aoc2021/blob/main/day8/day8.ts
-    int2sig = {v: k for k, v in p.getSolution().items()}
-    for d, len_d in zip(digits, map(len, digits)):
-        if len_d == 5:
-            p.addVariable(d, (2, 3, 5))
+    for i, d in enumerate(digits):
+        if len(d) == 5:
+            candidates[i] = (2, 3, 5)
             if d.issuperset(int2sig[7]):
-                p.addConstraint(ExactSumConstraint(3), (d,))
+                candidates[i] = (3,)
             elif d.issuperset(int2sig[4] - int2sig[1]):
-                p.addConstraint(ExactSumConstraint(5), (d,))
-        elif len_d == 6:
-            p.addVariable(d, (0, 6, 9))
+                candidates[i] = (5,)
+        elif len(d) == 6:
+            candidates[i] = (0, 6, 9)
             if not d.issuperset(int2sig[7]):
-                p.addConstraint(ExactSumConstraint(6), (d,))
+                candidates[i] = (6,)
             elif not d.issuperset(int2sig[4] - int2sig[1]):
-                p.addConstraint(ExactSumConstraint(0), (d,))
+                candidates[i] = (0,)
+
+    solution = problem.getSolution()
+    return tuple(solution[i] for i in range(10))
 
-    sig2int = p.getSolution()
+def canonical(d):
+    return ''.join(sorted(d))
+
+def decode_line(digits, number):
+    """
+    >>> solve.cache_clear()
+    >>> h = StringIO('acedgfb cdfbe gcdfa fbcad dab cefabd cdfgeb eafb cagedb ab | cdfeb fcadb cdfeb cdbaf')
+    >>> decode_line(*(load(h)[0]))
+    5353
+
+    The same wiring listed in another order is served from the cache.
+
+    >>> h = StringIO('ab cagedb eafb cdfgeb cefabd dab fbcad gcdfa cdfbe acedgfb | ab ba dab eafb')
+    >>> decode_line(*(load(h)[0]))
+    1174
+    >>> solve.cache_info().hits, solve.cache_info().misses
+    (1, 1)
+    """
+    patterns = tuple(sorted(map(canonical, digits)))
+    sig2int = dict(zip(patterns, solve(patterns)))
     out = 0
     for n in number:
-        out = out * 10 + sig2int[n]
+        out = out * 10 + sig2int[canonical(n)]
     return out
 
 if __name__ == '__main__':
-    with open('./input/day_08.txt', 'r') as f:
-        data = load(f)
-    print(f'part 1: {count_simple_digits(data)}')
-    print(f'part 2: {sum(starmap(decode_line, data))}')
+    from day_08 import main
+    main(['constraint'])
@@ -0,0 +1,71 @@
+from collections import Counter
+from io import StringIO
+from itertools import chain, permutations, starmap
+
+from day_08 import digit_to_segments_count, digit_segments
+
+def encode(pattern):
+    """
+    >>> encode('ab'), encode('ba'), encode('abcdefg')
+    (3, 3, 127)
+    """
+    mask = 0
+    for c in pattern:
+        mask |= 1 << (ord(c) - ord('a'))
+    return mask
+
+def build_table():
+    """
+    Every wiring of the seven segments, keyed on the sorted masks of its ten
+    patterns, which do not depend on the order the patterns are listed in.
+    """
+    table = {}
+    for wiring in permutations(range(7)):
+        masks = [sum(1 << wiring[ord(c) - ord('a')] for c in s) for s in digit_segments]
+        table[tuple(sorted(masks))] = {m: d for d, m in enumerate(masks)}
+    return table
+
+table = build_table()
+
+def load(h):
+    out = []
+    for line in h:
+        patterns, value = line.strip('\n').split(' | ')
+        out.append((tuple(map(encode, patterns.split(' '))), tuple(map(encode, value.split(' ')))))
+    return out
+
+def count_simple_digits(data):
+    """
+    >>> h = StringIO(\
+    'be cfbegad cbdgef fgaecd cgeb fdcge agebfd fecdb fabcd edb | fdgacbe cefdb cefbgd gcbe\\n' \
+    'edbfga begcd cbg gc gcadebf fbgde acbgfd abcde gfcbed gfec | fcgedb cgb dgebacf gc\\n' \
+    'fgaebd cg bdaec gdafb agbcfd gdcbef bgcad gfac gcb cdgabef | cg cg fdcagb cbg\\n' \
+    'fbegcd cbd adcefb dageb afcb bc aefdc ecdab fgdeca fcdbega | efabcd cedba gadfec cb\\n' \
+    'aecbfdg fbg gf bafeg dbefa fcge gcbea fcaegb dgceab fcbdga | gecf egdcabf bgf bfgea\\n' \
+    'fgeab ca afcebg bdacfeg cfaedg gcfdb baec bfadeg bafgc acf | gebdcfa ecba ca fadegcb\\n' \
+    'dbcfg fgd bdegcaf fgec aegbdf ecdfab fbedc dacgb gdcebf gf | cefg dcbef fcge gbcadfe\\n' \
+    'bdfegc cbegaf gecbf dfcage bdacg ed bedf ced adcbefg gebcd | ed bcgafe cdgba cbgef\\n' \
+    'egadfb cdbfeg cegd fecab cgb gbdefca cg fgcdab egfdb bfceg | gbdfcae bgc cg cgb\\n' \
+    'gcafb gcf dcaebfg ecagb gf abcdeg gaef cafbge fdbac fegbdc | fgae cfgab fg bagce')
+    >>> data = load(h)
+    >>> count_simple_digits(data), sum(starmap(decode_line, data))
+    (26, 61229)
+    """
+    c = Counter(chain(*[[j.bit_count() for j in i] for _, i in data]))
+    return sum([c[digit_to_segments_count[i]] for i in (1, 4, 7, 8)])
+
+def decode_line(digits, number):
+    """
+    >>> h = StringIO('acedgfb cdfbe gcdfa fbcad dab cefabd cdfgeb eafb cagedb ab | cdfeb fcadb cdfeb cdbaf')
+    >>> decode_line(*(load(h)[0]))
+    5353
+    """
+    mask2int = table[tuple(sorted(digits))]
+    out = 0
+    for n in number:
+        out = out * 10 + mask2int[n]
+    return out
+
+if __name__ == '__main__':
+    from day_08 import main
+    main(['lookup'])
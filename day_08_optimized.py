@@ -1,36 +1,8 @@
-from collections import Counter
 from io import StringIO
-from itertools import chain, starmap, tee
+from itertools import tee
 from copy import copy
 
-digit_to_segments_count = {1: 2, 4: 4, 7: 3, 8: 7}
-segments_count_to_digit = {2: 1, 4: 4, 3: 7, 7: 8}
-
-def load(h):
-    out = []
-    for line in h:
-        patterns, value = line.strip('\n').split(' | ')
-        out.append((tuple(map(frozenset, patterns.split(' '))), tuple(map(frozenset, value.split(' ')))))
-    return out
-
-def count_simple_digits(data):
-    """
-    >>> h = StringIO(\
-    'be cfbegad cbdgef fgaecd cgeb fdcge agebfd fecdb fabcd edb | fdgacbe cefdb cefbgd gcbe\\n' \
-    'edbfga begcd cbg gc gcadebf fbgde acbgfd abcde gfcbed gfec | fcgedb cgb dgebacf gc\\n' \
-    'fgaebd cg bdaec gdafb agbcfd gdcbef bgcad gfac gcb cdgabef | cg cg fdcagb cbg\\n' \
-    'fbegcd cbd adcefb dageb afcb bc aefdc ecdab fgdeca fcdbega | efabcd cedba gadfec cb\\n' \
-    'aecbfdg fbg gf bafeg dbefa fcge gcbea fcaegb dgceab fcbdga | gecf egdcabf bgf bfgea\\n' \
-    'fgeab ca afcebg bdacfeg cfaedg gcfdb baec bfadeg bafgc acf | gebdcfa ecba ca fadegcb\\n' \
-    'dbcfg fgd bdegcaf fgec aegbdf ecdfab fbedc dacgb gdcebf gf | cefg dcbef fcge gbcadfe\\n' \
-    'bdfegc cbegaf gecbf dfcage bdacg ed bedf ced adcbefg gebcd | ed bcgafe cdgba cbgef\\n' \
-    'egadfb cdbfeg cegd fecab cgb gbdefca cg fgcdab egfdb bfceg | gbdfcae bgc cg cgb\\n' \
-    'gcafb gcf dcaebfg ecagb gf abcdeg gaef cafbge fdbac fegbdc | fgae cfgab fg bagce')
-    >>> count_simple_digits(load(h))
-    26
-    """
-    c = Counter(chain(*[[len(j) for j in i] for _, i in data]))
-    return sum([c[digit_to_segments_count[i]] for i in (1, 4, 7, 8)])
+from day_08 import load, count_simple_digits, segments_count_to_digit
 
 def decode_line(digits, number):
     """
@@ -78,7 +50,5 @@ def decode_line(digits, number):
     return out
 
 if __name__ == '__main__':
-    with open('./input/day_08.txt', 'r') as f:
-        data = load(f)
-    print(f'part 1: {count_simple_digits(data)}')
-    print(f'part 2: {sum(starmap(decode_line, data))}')
+    from day_08 import main
+    main(['optimized'])
@@ -1,7 +1,11 @@
 from io import StringIO
 import networkx as nx
+import numpy as np
 from functools import reduce
 from operator import mul
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product, repeat
+import heapq
 
 G = nx.DiGraph()
 adj = ((-1, 0), (0, 1), (1, 0), (0, -1))
@@ -62,8 +66,148 @@ def three_largest_basins():
     return reduce(mul, sorted(basins, reverse=True)[:3])
 
 
+sample = '2199943210\n3987894921\n9856789892\n8767896789\n9899965678'
+
+def load_array(f):
+    return np.array([np.frombuffer(line.strip('\n').encode(), dtype=np.uint8) - ord('0')
+                     for line in f if line.strip('\n')], dtype=np.uint8)
+
+def low_points(heights):
+    """Mask of cells lower than all of their neighbours."""
+    padded = np.pad(heights, 1, constant_values=10)
+    center = padded[1:-1, 1:-1]
+    return ((center < padded[:-2, 1:-1]) & (center < padded[2:, 1:-1]) &
+            (center < padded[1:-1, :-2]) & (center < padded[1:-1, 2:]))
+
+def risk_levels_sum_array(heights):
+    """
+    >>> risk_levels_sum_array(load_array(StringIO(sample)))
+    15
+    """
+    return int((heights[low_points(heights)].astype(np.int64) + 1).sum())
+
+def label_basins(heights):
+    """
+    Connected components of non-9 cells as a label per cell, -1 for 9s.
+    Union-find over neighbour pairs with every root pointing at the
+    smallest index: hook the larger root of each pair still split onto
+    the smaller one, compress paths by pointer jumping, repeat.
+    """
+    mask = heights != 9
+    idx = np.arange(heights.size).reshape(heights.shape)
+    right = idx[:, :-1][mask[:, :-1] & mask[:, 1:]]
+    down = idx[:-1][mask[:-1] & mask[1:]]
+    a = np.concatenate((right, down))
+    b = np.concatenate((right + 1, down + heights.shape[1]))
+    parent = np.arange(heights.size)
+    while True:
+        root_a, root_b = parent[a], parent[b]
+        split = root_a != root_b
+        if not split.any():
+            break
+        np.minimum.at(parent, np.maximum(root_a, root_b)[split], np.minimum(root_a, root_b)[split])
+        while not np.array_equal(jumped := parent[parent], parent):
+            parent = jumped
+    return np.where(mask, parent.reshape(heights.shape), -1)
+
+def three_largest_basins_array(heights):
+    """
+    >>> three_largest_basins_array(load_array(StringIO(sample)))
+    1134
+    """
+    labels = label_basins(heights)
+    sizes = np.bincount(labels[labels >= 0])
+    return reduce(mul, sorted(sizes[sizes > 0].tolist(), reverse=True)[:3])
+
+
+def open_heightmap(fname):
+    """Memory-map a digit file as a (rows, width) array of ASCII digits."""
+    with open(fname, 'rb') as f:
+        width = len(f.readline().rstrip(b'\n'))
+    raw = np.memmap(fname, dtype=np.uint8, mode='r')
+    rows = (len(raw) + 1) // (width + 1)
+    return np.lib.stride_tricks.as_strided(raw, shape=(rows, width), strides=(width + 1, 1), writeable=False)
+
+def basin_tile(fname, r0, r1, c0, c1, k=3):
+    """
+    Analyse grid[r0:r1, c0:c1] reading only the tile and a one cell halo.
+    Returns the tile's risk sum, the k largest basins lying fully inside it,
+    sizes of basins touching its edges keyed by label, and the labels along
+    its top, bottom, left and right edges. Labels are flat grid indices.
+    """
+    grid = open_heightmap(fname)
+    rows, cols = grid.shape
+    h0, h1, w0, w1 = max(r0 - 1, 0), min(r1 + 1, rows), max(c0 - 1, 0), min(c1 + 1, cols)
+    halo = np.asarray(grid[h0:h1, w0:w1]) - ord('0')
+    inner = (slice(r0 - h0, r0 - h0 + r1 - r0), slice(c0 - w0, c0 - w0 + c1 - c0))
+    heights = halo[inner]
+    risk = int((heights[low_points(halo)[inner]].astype(np.int64) + 1).sum())
+
+    local = label_basins(heights)
+    y, x = np.divmod(local, c1 - c0)
+    labels = np.where(local >= 0, (r0 + y) * cols + c0 + x, -1)
+    ids, sizes = np.unique(labels[labels >= 0], return_counts=True)
+    edges = (labels[0], labels[-1], labels[:, 0], labels[:, -1])
+    on_edge = np.isin(ids, np.concatenate(edges))
+    interior = heapq.nlargest(k, sizes[~on_edge].tolist())
+    return risk, interior, dict(zip(ids[on_edge].tolist(), sizes[on_edge].tolist())), edges
+
+def tiled_basins(fname, tile=(1024, 1024), k=3, workers=None):
+    """
+    Risk level sum and the k largest basin sizes of a heightmap file,
+    analysed tile by tile so the full grid is never in memory. Basins cut
+    by tile seams are joined with a union-find over the edge labels. With
+    `workers` the tiles are analysed in a process pool.
+
+    >>> import tempfile
+    >>> with tempfile.NamedTemporaryFile('w', suffix='.txt') as f:
+    ...     _ = f.write(sample)
+    ...     f.flush()
+    ...     tiled_basins(f.name, tile=(2, 3)), tiled_basins(f.name, tile=(3, 4), workers=2)
+    ((15, [14, 9, 9]), (15, [14, 9, 9]))
+    """
+    rows, cols = open_heightmap(fname).shape
+    row_starts, col_starts = range(0, rows, tile[0]), range(0, cols, tile[1])
+    bounds = [(r, min(r + tile[0], rows), c, min(c + tile[1], cols))
+              for r, c in product(row_starts, col_starts)]
+    args = (repeat(fname), *zip(*bounds), repeat(k))
+    if workers:
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(basin_tile, *args, chunksize=4))
+    else:
+        results = list(map(basin_tile, *args))
+
+    parent = {}
+
+    def find(a):
+        while parent.setdefault(a, a) != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        return a
+
+    ncols = len(col_starts)
+    for t, (_, _, _, (top, bottom, left, right)) in enumerate(results):
+        neighbours = []
+        if t % ncols + 1 < ncols:
+            neighbours.append((right, results[t + 1][3][2]))
+        if t + ncols < len(results):
+            neighbours.append((bottom, results[t + ncols][3][0]))
+        for a, b in neighbours:
+            joined = (a >= 0) & (b >= 0)
+            for x, y in set(zip(a[joined].tolist(), b[joined].tolist())):
+                parent[find(x)] = find(y)
+
+    risk, largest, merged = 0, [], {}
+    for tile_risk, interior, on_edge, _ in results:
+        risk += tile_risk
+        largest.extend(interior)
+        for label, size in on_edge.items():
+            root = find(label)
+            merged[root] = merged.get(root, 0) + size
+    return risk, heapq.nlargest(k, largest + list(merged.values()))
+
 if __name__ == '__main__':
     with open('./input/day_09.txt', 'r') as f:
-        load(f)
-    print(f'part 1: {risk_levels_sum()}')
-    print(f'part 2: {three_largest_basins()}')
+        heights = load_array(f)
+    print(f'part 1: {risk_levels_sum_array(heights)}')
+    print(f'part 2: {three_largest_basins_array(heights)}')
@@ -1,18 +1,71 @@
-from collections import deque
-from functools import lru_cache
+from collections import deque, namedtuple, OrderedDict
+from functools import update_wrapper
+from hashlib import blake2b
+import random
+import sys
+from time import perf_counter
 
 
 opening = {'{': '}', '(': ')', '[': ']', '<': '>'}
 error_cost = {')': 3, ']': 57, '}': 1197, '>': 25137}
 completion_cost = {')': 1, ']': 2, '}': 3, '>': 4}
 
+class Corrupted(str):
+    """The first illegal closing character of a corrupted line."""
+
+class Completion(str):
+    """The closing characters that complete an incomplete line."""
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+class DigestCache:
+    """
+    LRU cache for functions of one string, keyed on a 16 byte digest of the
+    string so long lines are not kept alive, holding at most `maxsize`
+    results. Results must be immutable since they are shared.
+
+    >>> check = digest_cache(maxsize=2)(find_error.func)
+    >>> for line in ('[<>]', '[<>]', '(]', '{', '[<>]'):
+    ...     _ = check(line)
+    >>> check.cache_info()
+    CacheInfo(hits=1, misses=4, evictions=2, maxsize=2, currsize=2)
+    """
+    def __init__(self, func, maxsize=4096):
+        update_wrapper(self, func)
+        self.func = func
+        self.maxsize = maxsize
+        self.cache_clear()
+
+    def __call__(self, line):
+        key = blake2b(line.encode(), digest_size=16).digest()
+        if key in self.results:
+            self.hits += 1
+            self.results.move_to_end(key)
+            return self.results[key]
+        self.misses += 1
+        result = self.results[key] = self.func(line)
+        while len(self.results) > self.maxsize:
+            self.results.popitem(last=False)
+            self.evictions += 1
+        return result
+
+    def cache_info(self):
+        return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self.results))
+
+    def cache_clear(self):
+        self.results = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+
+def digest_cache(maxsize=4096):
+    return lambda func: DigestCache(func, maxsize)
+
 def load(f):
     data = []
     for line in f:
         data.append(line.strip('\n'))
     return data
 
-@lru_cache
+@digest_cache(maxsize=4096)
 def find_error(line):
     """
     >>> find_error('{([(<{}[<>[]}>{[]{[(<()>')
@@ -26,7 +79,7 @@ def find_error(line):
     >>> find_error('<{([([[(<>()){}]>(<<{{')
     '>'
     >>> find_error('[({(<(())[]>[[{[]{<()<>>')
-    deque([']', ')', '}', ')', ']', ']', '}', '}'])
+    '}}]])})]'
     """
     l = deque(line)
     mirror = deque()
@@ -37,14 +90,14 @@ def find_error(line):
         else:
             q = mirror.pop()
             if q != p:
-                return p
-    return mirror
+                return Corrupted(p)
+    return Completion(''.join(reversed(mirror)))
 
 def filter_errors(data, etype):
     return filter(lambda x: isinstance(x, etype), map(find_error, data))
 
 def total_error_score(data):
-    return sum(map(error_cost.get, filter_errors(data, str)))
+    return sum(map(error_cost.get, filter_errors(data, Corrupted)))
 
 def autocomplete_score(data):
     """
@@ -62,14 +115,126 @@ def autocomplete_score(data):
     288957
     """
     totals = []
-    for e in filter_errors(data, deque):
+    for e in filter_errors(data, Completion):
         total = 0
-        while e:
-            total = total * 5 + completion_cost[e.pop()]
+        for c in e:
+            total = total * 5 + completion_cost[c]
         totals.append(total)
-    return sorted(totals)[(len(totals) // 2)]
+    return select(totals, len(totals) // 2)
+
+def select(items, k):
+    """
+    The k-th smallest item in expected linear time (quickselect).
+
+    >>> select([5, 1, 4, 1, 3], 0), select([5, 1, 4, 1, 3], 2), select([5, 1, 4, 1, 3], 4)
+    (1, 3, 5)
+    """
+    while True:
+        pivot = random.choice(items)
+        lower = [i for i in items if i < pivot]
+        if k < len(lower):
+            items = lower
+            continue
+        equal = sum(1 for i in items if i == pivot)
+        if k < len(lower) + equal:
+            return pivot
+        k -= len(lower) + equal
+        items = [i for i in items if i > pivot]
+
+
+class StreamValidator:
+    """
+    Syntax checker fed chunks of a stream that need not end on line
+    boundaries. The stack of expected closers is carried from one chunk to
+    the next, feed() returns the result of every line finished in the chunk,
+    blank lines included, so results line up with find_error over the lines.
+
+    >>> v = StreamValidator()
+    >>> v.feed('[({(<(())[]>[[{[]{<()<>>\\n{([(<{}[<>[]}>{')
+    ['}}]])})]']
+    >>> v.feed(b'[]{[(<()>\\n[<>')
+    ['}']
+    >>> v.close()
+    [']']
+    >>> v.feed('[<>\\n\\n(]\\n') + v.close() == list(map(find_error, ['[<>', '', '(]']))
+    True
+    """
+    def __init__(self):
+        self.mirror = []
+        self.error = None
+        self.started = False
+
+    def feed(self, chunk):
+        if isinstance(chunk, bytes):
+            chunk = chunk.decode('ascii')
+        *finished, rest = chunk.split('\n')
+        results = []
+        for part in finished:
+            self.scan(part)
+            results.append(self.end_line())
+        self.scan(rest)
+        return results
+
+    def scan(self, part):
+        self.started = self.started or bool(part)
+        if self.error is not None:
+            return
+        mirror = self.mirror
+        for p in part:
+            if p in opening:
+                mirror.append(opening[p])
+            elif not mirror or mirror.pop() != p:
+                self.error = Corrupted(p)
+                return
+
+    def end_line(self):
+        if self.error is not None:
+            result = self.error
+        else:
+            result = Completion(''.join(reversed(self.mirror)))
+        self.__init__()
+        return result
+
+    def close(self):
+        """End the stream, returns the result of its last line unless it was empty."""
+        return [self.end_line()] if self.started else []
+
+def benchmark(lines=100000, chunk_size=1 << 16, seed=0):
+    rnd = random.Random(seed)
+    data = []
+    for _ in range(lines):
+        line, mirror = [], []
+        if rnd.random() < 0.01:
+            data.append('')
+            continue
+        for _ in range(rnd.randint(20, 120)):
+            if mirror and rnd.random() < 0.45:
+                closer = mirror.pop()
+                line.append(closer if rnd.random() < 0.99 else rnd.choice(')]}>'))
+            else:
+                p = rnd.choice('([{<')
+                line.append(p)
+                mirror.append(opening[p])
+        data.append(''.join(line))
+    stream = '\n'.join(data) + '\n'
+    start = perf_counter()
+    expected = list(map(find_error.func, data))
+    deque_time = perf_counter() - start
+    start = perf_counter()
+    v = StreamValidator()
+    results = []
+    for i in range(0, len(stream), chunk_size):
+        results.extend(v.feed(stream[i:i + chunk_size]))
+    results.extend(v.close())
+    stream_time = perf_counter() - start
+    assert results == expected
+    print(f'deque popleft: {lines / deque_time:12.0f} lines/s')
+    print(f'stream feed:   {lines / stream_time:12.0f} lines/s')
 
 if __name__ == '__main__':
+    if sys.argv[1:2] == ['bench']:
+        benchmark()
+        sys.exit()
     with open('./input/day_10.txt', 'r') as f:
         data = load(f)
     print(f'part 1: {total_error_score(data)}')
@@ -1,25 +1,22 @@
 from io import StringIO
-from copy import copy
+from hashlib import blake2b
+import numpy as np
 
 adj = ((-1, -1), (-1, 0), (-1, 1),
         (0, -1),           (0, 1),
         (1, -1),  (1, 0),  (1, 1))
 
-max_y, max_x = 0, 0
 def load(f):
-    global max_y, max_x
     data = dict()
     for y, line in enumerate(f):
-        max_y = max(max_y, y)
         for x, energy in enumerate(map(int, line.strip('\n'))):
             data[(y, x)] = energy
-            max_x = max(max_x, x)
     return data
 
 
 def flash(data, flashed, y, x):
     for dy, dx in adj:
-        if x+dx < 0 or x+dx > max_x or y+dy < 0 or y+dy > max_y:
+        if (y+dy, x+dx) not in data:
             continue
         incr_energy(data, flashed, (y+dy, x+dx))
 
@@ -32,6 +29,7 @@ def incr_energy(data, flashed, yx):
 
 
 def print_data(data):
+    max_y, max_x = map(max, zip(*data.keys()))
     for y in range(max_y+1):
         for x in range(max_x+1):
             print(data[(y, x)], end='')
@@ -46,6 +44,7 @@ def step(data):
     '19991\\n'\
     '11111'))
     >>> step(data)
+    9
     >>> print_data(data)
     34543
     40004
@@ -53,6 +52,7 @@ def step(data):
     40004
     34543
     >>> step(data)
+    0
     >>> print_data(data)
     45654
     51115
@@ -67,7 +67,54 @@ def step(data):
         data[yx] = 0
     return len(flashed)
 
-def part_1(data):
+def load_array(f):
+    return np.array([list(map(int, line.strip('\n'))) for line in f if line.strip('\n')], dtype=np.int8)
+
+def neighbour_counts(mask):
+    """Number of set cells among the eight neighbours of every cell, over the last two axes."""
+    padded = np.pad(mask.astype(np.int8), ((0, 0),) * (mask.ndim - 2) + ((1, 1), (1, 1)))
+    rows, cols = mask.shape[-2:]
+    return sum(padded[..., 1 + dy:1 + dy + rows, 1 + dx:1 + dx + cols] for dy, dx in adj)
+
+def step_array(energy, valid=None):
+    """
+    Same as step on a 2-D array, flashing in waves instead of recursing.
+    A (grids, rows, cols) stack steps every grid at once and returns the
+    flash count per grid; cells outside `valid` stay at zero.
+
+    >>> energy = load_array(StringIO('11111\\n19991\\n19191\\n19991\\n11111'))
+    >>> step_array(energy), step_array(energy)
+    (9, 0)
+    >>> energy
+    array([[4, 5, 6, 5, 4],
+           [5, 1, 1, 1, 5],
+           [6, 1, 1, 1, 6],
+           [5, 1, 1, 1, 5],
+           [4, 5, 6, 5, 4]], dtype=int8)
+    """
+    if valid is None:
+        valid = np.ones(energy.shape, dtype=bool)
+    energy += 1
+    energy[~valid] = 0
+    flashed = np.zeros(energy.shape, dtype=bool)
+    new = energy > 9
+    while new.any():
+        flashed |= new
+        energy += neighbour_counts(new)
+        energy[~valid] = 0
+        new = (energy > 9) & ~flashed & valid
+        np.minimum(energy, 10, out=energy)
+    energy[flashed] = 0
+    if energy.ndim == 2:
+        return int(np.count_nonzero(flashed))
+    return np.count_nonzero(flashed, axis=(-2, -1))
+
+sample = (
+    '5483143223\n2745854711\n5264556173\n6141336146\n6357385478\n'
+    '4167524645\n2176841721\n6882881134\n4846848554\n5283751526'
+)
+
+def part_1(data, step=step):
     """
     >>> data = load(StringIO(\
     '5483143223\\n' \
@@ -82,19 +129,78 @@ def part_1(data):
     '5283751526'))
     >>> part_1(data)
     1656
+    >>> part_1(load_array(StringIO(sample)), step_array)
+    1656
     """
     return sum([step(data) for _ in range(100)])
 
-def part_2(data):
+def part_2(data, step=step):
+    """
+    >>> part_2(load_array(StringIO(sample)), step_array)
+    195
+    """
+    cells = data.size if isinstance(data, np.ndarray) else len(data)
     i = 0
     while True:
         c = step(data)
         i += 1
-        if c == len(data):
+        if c == cells:
             return i
 
+NEVER = -1
+
+def synchronize(grids, max_steps=None):
+    """
+    First step at which every octopus of each grid flashes, for grids of any
+    sizes stepped together as one zero padded 3-D stack. Grid states are
+    hashed, so a grid that comes back to an earlier state without having
+    synchronized gets NEVER. Grids still running after `max_steps` get 0.
+
+    >>> synchronize([load_array(StringIO(sample)), np.full((3, 4), 9), np.array([[1, 2]])])
+    [195, 1, 8]
+    >>> synchronize([np.array([[0, 0, 0, 0, 0, 0, 0, 0, 0, 9, 8]])]) == [NEVER]
+    True
+    >>> synchronize([load_array(StringIO(sample))], max_steps=100)
+    [0]
+
+    Padding never gains energy, so it cannot flash into smaller grids.
+
+    >>> synchronize([np.zeros((2, 2), int), np.zeros((1, 1), int)])
+    [10, 10]
+    """
+    rows = max(g.shape[0] for g in grids)
+    cols = max(g.shape[1] for g in grids)
+    energy = np.zeros((len(grids), rows, cols), dtype=np.int8)
+    valid = np.zeros(energy.shape, dtype=bool)
+    for i, g in enumerate(grids):
+        energy[i, :g.shape[0], :g.shape[1]] = g
+        valid[i, :g.shape[0], :g.shape[1]] = True
+    cells = valid.sum(axis=(1, 2))
+    result = [0] * len(grids)
+    active = np.arange(len(grids))
+    seen = [set() for _ in grids]
+    i = 0
+    while len(active) and (max_steps is None or i < max_steps):
+        flashes = step_array(energy, valid)
+        i += 1
+        done = flashes == cells
+        for j in np.flatnonzero(done):
+            result[active[j]] = i
+        for j in np.flatnonzero(~done):
+            state = blake2b(energy[j].tobytes(), digest_size=16).digest()
+            if state in seen[active[j]]:
+                done[j] = True
+                result[active[j]] = NEVER
+            seen[active[j]].add(state)
+        if done.any():
+            for j in active[done]:
+                seen[j] = None
+            keep = ~done
+            active, energy, valid, cells = active[keep], energy[keep], valid[keep], cells[keep]
+    return result
+
 if __name__ == '__main__':
     with open('./input/day_11.txt', 'r') as f:
-        data = load(f)
-    print(f'part 1: {part_1(copy(data))}')
-    print(f'part 2: {part_2(data)}')
\ No newline at end of file
+        data = load_array(f)
+    print(f'part 1: {part_1(data.copy(), step_array)}')
+    print(f'part 2: {part_2(data, step_array)}')
\ No newline at end of file
@@ -3,6 +3,7 @@ import networkx as nx
 from copy import copy
 from collections import defaultdict
 from pprint import pprint
+from functools import lru_cache
 
 
 def load(f):
@@ -80,8 +81,86 @@ def part2(g):
             paths.add(tuple(p))
     return paths
 
+def count_paths_memo(g, allow_revisit=False, src='start', dst='end'):
+    """
+    Number of paths from src to dst without listing them. Caves get integer
+    ids and the small caves visited so far are a bitmask, so the count is
+    memoized on (cave, visited small caves, revisit used).
+
+    >>> g = load(StringIO('start-A\\nstart-b\\nA-c\\nA-b\\nb-d\\nA-end\\nb-end'))
+    >>> count_paths_memo(g), count_paths_memo(g, allow_revisit=True)
+    (10, 36)
+    >>> g = load(StringIO('dc-end\\nHN-start\\nstart-kj\\ndc-start\\ndc-HN\\nLN-dc\\nHN-end\\nkj-sa\\nkj-HN\\nkj-dc'))
+    >>> count_paths_memo(g), count_paths_memo(g, allow_revisit=True)
+    (19, 103)
+    """
+    ids = {cave: i for i, cave in enumerate(sorted(g.nodes))}
+    small = [cave.islower() for cave in sorted(g.nodes)]
+    adj = [[ids[n] for n in g.adj[cave]] for cave in sorted(g.nodes)]
+    start, end = ids[src], ids[dst]
+
+    @lru_cache(maxsize=None)
+    def count(node, visited, revisited):
+        if node == end:
+            return 1
+        total = 0
+        for n in adj[node]:
+            bit = 1 << n
+            if not small[n]:
+                total += count(n, visited, revisited)
+            elif not visited & bit:
+                total += count(n, visited | bit, revisited)
+            elif not revisited and n not in (start, end):
+                total += count(n, visited, True)
+        return total
+
+    start_mask = 1 << start if small[start] else 0
+    return count(start, start_mask, not allow_revisit)
+
+def iter_paths(g, src='start', dst='end', revisits=0):
+    """
+    Yield every path from src to dst as a tuple, one at a time, from an
+    explicit-stack DFS holding only the current path. Small caves other
+    than src and dst may be visited twice, by at most `revisits` of them.
+    Each path is a distinct sequence of DFS choices, so none repeats.
+
+    >>> g = load(StringIO('start-A\\nstart-b\\nA-c\\nA-b\\nb-d\\nA-end\\nb-end'))
+    >>> next(iter_paths(g))
+    ('start', 'A', 'b', 'A', 'c', 'A', 'end')
+    >>> sum(1 for _ in iter_paths(g)), sum(1 for _ in iter_paths(g, revisits=1))
+    (10, 36)
+    >>> sorted(iter_paths(g, 'b', 'c'))[:3]
+    [('b', 'A', 'c'), ('b', 'A', 'end', 'A', 'c'), ('b', 'A', 'end', 'A', 'start', 'A', 'c')]
+    >>> [sum(1 for _ in iter_paths(g, 'd', 'c', revisits=k)) for k in range(3)]
+    [9, 66, 238]
+    """
+    visits = defaultdict(int)
+    visits[src] = 2
+    path = [src]
+    stack = [iter(sorted(g.adj[src]))]
+    doubled = 0
+    while stack:
+        node = next(stack[-1], None)
+        if node is None:
+            stack.pop()
+            left = path.pop()
+            if left.islower() and left != src:
+                visits[left] -= 1
+                doubled -= visits[left] == 1
+            continue
+        if node == dst:
+            yield (*path, node)
+            continue
+        if node.islower():
+            if visits[node] >= 2 or (visits[node] == 1 and doubled >= revisits):
+                continue
+            visits[node] += 1
+            doubled += visits[node] == 2
+        path.append(node)
+        stack.append(iter(sorted(g.adj[node])))
+
 if __name__ == '__main__':
     with open('./input/day_12.txt', 'r') as f:
         g = load(f)
-    print(f'part 1: {len(count_paths(g))}')
-    print(f'part 2: {len(part2(g))}')
+    print(f'part 1: {count_paths_memo(g)}')
+    print(f'part 2: {count_paths_memo(g, allow_revisit=True)}')
@@ -5,6 +5,7 @@ import re
 
 def load(f):
     coords = []
+    max_x, max_y = 0, 0
 
     while (line := f.readline()) != '\n':
         x, y = tuple(map(int, line.split(',')))
@@ -83,11 +84,80 @@ def follow_all_instructions(a, instructions):
     return a
 
 
+def load_points(f):
+    """Dots as an (N, 2) array of (x, y) rows, and the folding instructions."""
+    coords = []
+    while (line := f.readline()) != '\n':
+        coords.append(tuple(map(int, line.split(','))))
+    folding_instructions = []
+    for line in f:
+        m = re.match(r'fold along (?P<axis>x|y)=(?P<at_coord>\d+)', line).groupdict()
+        m['at_coord'] = int(m['at_coord'])
+        folding_instructions.append(m)
+    return np.array(coords, dtype=np.int64).reshape(-1, 2), folding_instructions
+
+def fold_points(points, axis='x', at_coord=0):
+    """
+    Reflect the dots past the fold line onto the other side and drop
+    duplicates. Dots on the line are dropped like the row np.split cuts out
+    in fold, and a fold whose far side is longer than the near one raises.
+
+    >>> fold_points(np.array([[0, 1], [2, 1], [3, 0]]), 'x', 2).tolist()
+    [[0, 1], [1, 0]]
+    >>> fold_points(np.array([[0, 1], [5, 1]]), 'x', 2)
+    Traceback (most recent call last):
+    ...
+    ValueError: fold along x=2 maps dots past the edge of the sheet
+    """
+    col = 0 if axis == 'x' else 1
+    points = points[points[:, col] != at_coord]
+    past = points[:, col] > at_coord
+    if np.any(points[past, col] > 2 * at_coord):
+        raise ValueError(f'fold along {axis}={at_coord} maps dots past the edge of the sheet')
+    points[past, col] = 2 * at_coord - points[past, col]
+    return np.unique(points, axis=0)
+
+def to_array(points, shape=None):
+    """Dense (x, y) boolean sheet of the dots, sized by `shape` or the dots."""
+    if shape is None:
+        shape = tuple((points.max(axis=0) + 1).tolist()) if len(points) else (0, 0)
+    a = np.zeros(shape, dtype=bool)
+    a[points[:, 0], points[:, 1]] = True
+    return a
+
+def follow_all_instructions_points(points, instructions):
+    """
+    Same as follow_all_instructions on a sparse dot list, returns the dots
+    and the shape of the folded sheet.
+
+    >>> f = StringIO('6,10\\n0,14\\n9,10\\n0,3\\n10,4\\n4,11\\n6,0\\n6,12\\n4,1\\n0,13\\n10,12\\n3,4\\n'
+    ...              '3,0\\n8,4\\n1,10\\n2,14\\n8,10\\n9,0\\n\\nfold along y=7\\nfold along x=5')
+    >>> points, instructions = load_points(f)
+    >>> len(fold_points(points, **instructions[0]))
+    17
+    >>> points, shape = follow_all_instructions_points(points, instructions)
+    >>> print_dots(to_array(points, shape), '.')
+    #####
+    #...#
+    #...#
+    #...#
+    #####
+    .....
+    .....
+    >>> shape
+    (5, 7)
+    """
+    shape = (points.max(axis=0) + 1).tolist() if len(points) else [0, 0]
+    for i in instructions:
+        points = fold_points(points, **i)
+        shape[0 if i['axis'] == 'x' else 1] = i['at_coord']
+    return points, tuple(shape)
+
 if __name__ == '__main__':
     with open('./input/day_13.txt', 'r') as f:
-        array, folding = load(f)
-    print(f'part 1: {np.sum(fold(array, **folding[0]))}')
+        points, folding = load_points(f)
+    print(f'part 1: {len(fold_points(points, **folding[0]))}')
 
-    array = follow_all_instructions(array, folding)
+    points, shape = follow_all_instructions_points(points, folding)
     print('part 2:')
-    print_dots(array)
+    print_dots(to_array(points, shape))